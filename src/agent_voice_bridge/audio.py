@@ -2,69 +2,112 @@
 
 Twilio sends/receives μ-law encoded audio at 8kHz.
 Gemini expects/produces PCM16 at 16kHz or 24kHz.
+
+Base64 goes through binascii directly: the base64 module wrappers add an
+extra str → bytes conversion per call, which adds up at 50 packets/s.
 """
 
-import base64
-import struct
-from typing import TYPE_CHECKING
+import binascii
 
 import numpy as np
 
-if TYPE_CHECKING:
-    pass
-
-
-# μ-law decoding table (ITU-T G.711)
-ULAW_DECODE_TABLE = np.array(
-    [
-        -32124, -31100, -30076, -29052, -28028, -27004, -25980, -24956,
-        -23932, -22908, -21884, -20860, -19836, -18812, -17788, -16764,
-        -15996, -15484, -14972, -14460, -13948, -13436, -12924, -12412,
-        -11900, -11388, -10876, -10364, -9852, -9340, -8828, -8316,
-        -7932, -7676, -7420, -7164, -6908, -6652, -6396, -6140,
-        -5884, -5628, -5372, -5116, -4860, -4604, -4348, -4092,
-        -3900, -3772, -3644, -3516, -3388, -3260, -3132, -3004,
-        -2876, -2748, -2620, -2492, -2364, -2236, -2108, -1980,
-        -1884, -1820, -1756, -1692, -1628, -1564, -1500, -1436,
-        -1372, -1308, -1244, -1180, -1116, -1052, -988, -924,
-        -876, -844, -812, -780, -748, -716, -684, -652,
-        -620, -588, -556, -524, -492, -460, -428, -396,
-        -372, -356, -340, -324, -308, -292, -276, -260,
-        -244, -228, -212, -196, -180, -164, -148, -132,
-        -120, -112, -104, -96, -88, -80, -72, -64,
-        -56, -48, -40, -32, -24, -16, -8, 0,
-        32124, 31100, 30076, 29052, 28028, 27004, 25980, 24956,
-        23932, 22908, 21884, 20860, 19836, 18812, 17788, 16764,
-        15996, 15484, 14972, 14460, 13948, 13436, 12924, 12412,
-        11900, 11388, 10876, 10364, 9852, 9340, 8828, 8316,
-        7932, 7676, 7420, 7164, 6908, 6652, 6396, 6140,
-        5884, 5628, 5372, 5116, 4860, 4604, 4348, 4092,
-        3900, 3772, 3644, 3516, 3388, 3260, 3132, 3004,
-        2876, 2748, 2620, 2492, 2364, 2236, 2108, 1980,
-        1884, 1820, 1756, 1692, 1628, 1564, 1500, 1436,
-        1372, 1308, 1244, 1180, 1116, 1052, 988, 924,
-        876, 844, 812, 780, 748, 716, 684, 652,
-        620, 588, 556, 524, 492, 460, 428, 396,
-        372, 356, 340, 324, 308, 292, 276, 260,
-        244, 228, 212, 196, 180, 164, 148, 132,
-        120, 112, 104, 96, 88, 80, 72, 64,
-        56, 48, 40, 32, 24, 16, 8, 0,
-    ],
-    dtype=np.int16,
-)
-
-
-def ulaw_to_pcm16(ulaw_bytes: bytes) -> np.ndarray:
+
+def _build_ulaw_decode_table() -> np.ndarray:
+    """Expand every μ-law code with the closed-form G.711 decoder.
+    
+    Returns:
+        int16 array mapping each of the 256 codes to its PCM16 sample
+    """
+    ulaw = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (ulaw >> 4) & 0x07
+    mantissa = ulaw & 0x0F
+    magnitude = (((mantissa << 3) + 132) << exponent) - 132
+    return np.where(ulaw & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+def _build_ulaw_encode_table() -> np.ndarray:
+    """Run audioop's μ-law encoder over every PCM16 value.
+    
+    Mirrors ``audioop.lin2ulaw``, which works on 14-bit samples: the shift
+    down to 14 bits happens before the magnitude is taken, so negative
+    samples round away from zero and e.g. -1 encodes like -4, not like 1.
+    
+    Returns:
+        uint8 array of 65536 μ-law codes indexed by the sample's bit pattern
+        (``pcm16.view(np.uint16)``), so encoding is a single gather with no
+        abs, sign or segment arithmetic
+    """
+    # Every int16 value in uint16 index order: 0..32767, then -32768..-1
+    pcm = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32)
+    
+    # Bias the 14-bit magnitude; audioop clips it to 8159 + 33, one past the
+    # top segment, where it emits the loudest code, and capping at the top
+    # segment's end gives that same code
+    magnitude = np.minimum(np.abs(pcm >> 2) + 33, 0x1FFF)
+    
+    # Segment is the position of the highest set bit above bit 5
+    exponent = np.zeros_like(magnitude)
+    for bit in range(6, 13):
+        exponent[magnitude >= (1 << bit)] = bit - 5
+    
+    # Mantissa is the 4 bits following the leading one
+    mantissa = (magnitude >> (exponent + 1)) & 0x0F
+    
+    sign = np.where(pcm < 0, 0x80, 0)
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+
+def _pack_tables(*tables: np.ndarray, align: int = 64) -> np.ndarray:
+    """Copy tables back to back into one cache-line-aligned, read-only buffer.
+    
+    The decode and encode tables run back to back on every call, so keeping
+    them in one contiguous block lets them stay warm in cache together.
+    """
+    size = sum(t.nbytes for t in tables)
+    raw = np.empty(size + align, dtype=np.uint8)
+    offset = -raw.ctypes.data % align
+    packed = raw[offset : offset + size]
+    
+    pos = 0
+    for table in tables:
+        packed[pos : pos + table.nbytes] = table.view(np.uint8)
+        pos += table.nbytes
+    
+    packed.setflags(write=False)
+    return packed
+
+
+# μ-law lookup tables (ITU-T G.711), packed into one read-only block:
+# 256 int16 decode entries at offset 0, then the 64KiB encode table indexed
+# by the raw sample bits
+_AUDIO_TABLES = _pack_tables(_build_ulaw_decode_table(), _build_ulaw_encode_table())
+ULAW_DECODE_TABLE = _AUDIO_TABLES[:512].view(np.int16)
+ULAW_ENCODE_TABLE = _AUDIO_TABLES[512:]
+
+
+def ulaw_to_pcm16(ulaw_bytes: bytes, out: np.ndarray | None = None) -> np.ndarray:
     """Convert μ-law bytes to PCM16 numpy array.
     
     Args:
         ulaw_bytes: Raw μ-law encoded bytes
+        out: Optional int16 buffer of at least the input length to reuse
+            across calls
         
     Returns:
-        PCM16 samples as int16 numpy array
+        PCM16 samples as int16 numpy array (a view into ``out`` when given)
     """
     ulaw_array = np.frombuffer(ulaw_bytes, dtype=np.uint8)
-    return ULAW_DECODE_TABLE[ulaw_array]
+    if out is None:
+        return ULAW_DECODE_TABLE[ulaw_array]
+    # uint8 indices can't go out of range; mode="clip" lets take() write
+    # straight into out instead of buffering for the bounds check
+    return np.take(ULAW_DECODE_TABLE, ulaw_array, out=out[: len(ulaw_array)], mode="clip")
+
+
+def _encode_ulaw_into(pcm16: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """Encode int16 samples into ``out`` with one table gather."""
+    # Reinterpreting int16 as uint16 gives the table index directly
+    return np.take(ULAW_ENCODE_TABLE, pcm16.view(np.uint16), out=out, mode="clip")
 
 
 def pcm16_to_ulaw(pcm16: np.ndarray) -> bytes:
@@ -76,31 +119,149 @@ def pcm16_to_ulaw(pcm16: np.ndarray) -> bytes:
     Returns:
         μ-law encoded bytes
     """
-    # Ensure int16
-    pcm16 = pcm16.astype(np.int16)
+    # No-op for the usual contiguous int16 input
+    pcm16 = np.ascontiguousarray(pcm16, dtype=np.int16)
+    
+    return _encode_ulaw_into(pcm16, np.empty(len(pcm16), dtype=np.uint8)).tobytes()
+
+
+def _design_decimate_3x_taps(num_taps: int = 15) -> np.ndarray:
+    """Design the anti-alias low-pass used ahead of 3:1 decimation.
+
+    Hamming-windowed sinc with cutoff at 1/6 of the input rate (the output
+    Nyquist), quantized to Q15 so the filter runs in integer arithmetic.
+    """
+    n = np.arange(num_taps) - (num_taps - 1) / 2
+    taps = (1 / 3) * np.sinc(n / 3) * np.hamming(num_taps)
+    q15 = np.round(taps / taps.sum() * (1 << 15)).astype(np.int32)
+    # Put the rounding residue on the center tap so DC gain is exactly unity
+    q15[num_taps // 2] += (1 << 15) - q15.sum()
+    return q15.astype(np.int16)
+
+
+# 15-tap low-pass for 24kHz → 8kHz, Q15 fixed point
+DECIMATE_3X_TAPS = _design_decimate_3x_taps()
+_DECIMATE_3X_TAPS_I32 = DECIMATE_3X_TAPS.astype(np.int32)
+
+# Polyphase split of the taps: phase p holds taps p, p+3, ... and filters
+# the input samples at offsets p mod 3; as convolution kernels these are
+# reversed so they line up with the full-rate convolution
+_DECIMATE_3X_PHASES = [
+    np.ascontiguousarray(_DECIMATE_3X_TAPS_I32[::-1][p::3][::-1]) for p in range(3)
+]
+
+
+# Below this many outputs the three per-phase np.convolve calls cost more
+# in call overhead than they save in arithmetic, so short chunks take the
+# single full-rate convolution instead. Best of 7 per 24kHz chunk, NumPy 2.4:
+#
+#   input samples     full-rate   polyphase
+#     240 (10ms)        13us        19us
+#     480 (20ms)        17us        19us
+#     960 (40ms)        23us        23us
+#    1920 (80ms)        32us        29us
+#    4800 (200ms)       74us        54us
+#    9600 (400ms)      168us        94us
+#
+# so chunks of 40ms and longer take the polyphase path
+_POLYPHASE_MIN_OUTPUTS = 320
+
+
+def _decimate_3x(buf: np.ndarray, n_out: int) -> np.ndarray:
+    """Filter and keep every third sample.
     
-    # μ-law encoding
-    sign = (pcm16 < 0).astype(np.uint8) * 0x80
-    pcm16 = np.abs(pcm16)
+    Output ``m`` is the FIR over ``buf[3m : 3m + 15]``. Long inputs are
+    split into their three phases and each is convolved with its 5-tap
+    sub-filter at the output rate, so only the kept outputs are computed.
+    Short inputs run the full-rate convolution and discard two thirds of
+    it, which is faster at that size. Both give identical results.
     
-    # Bias
-    pcm16 = np.clip(pcm16 + 132, 0, 32767)
+    Args:
+        buf: int16 input with at least ``3 * n_out + 12`` samples
+        n_out: Number of output samples
+        
+    Returns:
+        int16 samples at a third of the rate
+    """
+    if n_out < _POLYPHASE_MIN_OUTPUTS:
+        window = buf[: 3 * n_out + len(_DECIMATE_3X_TAPS_I32) - 3].astype(np.int32)
+        filtered = np.convolve(window, _DECIMATE_3X_TAPS_I32, mode="valid")[::3]
+    else:
+        span = n_out + len(_DECIMATE_3X_PHASES[0]) - 1
+        # Rows of one contiguous copy, one row per phase
+        phases = buf[: 3 * span].reshape(span, 3).T.astype(np.int32)
+        
+        filtered = np.convolve(phases[0], _DECIMATE_3X_PHASES[0], mode="valid")
+        filtered += np.convolve(phases[1], _DECIMATE_3X_PHASES[1], mode="valid")
+        filtered += np.convolve(phases[2], _DECIMATE_3X_PHASES[2], mode="valid")
+    filtered >>= 15
+    return np.clip(filtered, -32768, 32767).astype(np.int16)
+
+
+def _fill_midpoints(out: np.ndarray, prev: int, work: np.ndarray | None = None) -> None:
+    """Write the 2x-upsampling midpoints into the even slots of ``out``.
     
-    # Find segment
-    exponent = np.floor(np.log2(pcm16.astype(np.float32) + 1)).astype(np.uint8)
-    exponent = np.clip(exponent - 7, 0, 7)
+    The odd slots hold the original samples; slot ``2i`` gets the midpoint
+    of sample ``i`` with the one before it, ``prev`` standing in for the
+    sample before the first. The arithmetic needs one int16 temporary of
+    the input length, taken from ``work`` when given.
+    """
+    samples = out[1::2]
+    midpoints = out[0::2]
+    midpoints[0] = (prev + int(samples[0])) >> 1
     
-    # Calculate mantissa
-    mantissa = (pcm16 >> (exponent + 3)) & 0x0F
+    # floor((a + b) / 2) without widening: ((a ^ b) >> 1) + (a & b)
+    a, b, rest = samples[:-1], samples[1:], midpoints[1:]
+    np.bitwise_xor(a, b, out=rest)
+    rest >>= 1
+    both = np.bitwise_and(a, b, out=None if work is None else work[: len(rest)])
+    rest += both
+
+
+def _upsample_2x_int16(x: np.ndarray, prev: int = 0) -> np.ndarray:
+    """Upsample int16 audio 2x, preceding each sample by a midpoint.
     
-    # Combine
-    ulaw = ~(sign | (exponent << 4) | mantissa) & 0xFF
+    Same convention as ``ulaw_decode_upsample2x``, so resampling decoded
+    audio matches the fused decode sample for sample.
     
-    return ulaw.astype(np.uint8).tobytes()
+    Args:
+        x: PCM16 samples
+        prev: Last sample of the previous packet
+        
+    Returns:
+        PCM16 samples at twice the rate
+    """
+    y = np.empty(2 * len(x), dtype=np.int16)
+    if len(x) == 0:
+        return y
+    y[1::2] = x
+    _fill_midpoints(y, prev)
+    return y
+
+
+def _downsample_3x_int16(x: np.ndarray) -> np.ndarray:
+    """Downsample int16 audio 3x with an anti-alias FIR ahead of decimation.
+    
+    Args:
+        x: PCM16 samples
+        
+    Returns:
+        PCM16 samples at a third of the rate
+    """
+    n_out = len(x) // 3
+    if n_out == 0:
+        return np.empty(0, dtype=np.int16)
+    # Zero-pad by half the filter so output m is centered on x[3m]
+    half = len(_DECIMATE_3X_TAPS_I32) // 2
+    return _decimate_3x(np.pad(x, half), n_out)
 
 
 def resample(audio: np.ndarray, from_rate: int, to_rate: int) -> np.ndarray:
-    """Resample audio using linear interpolation.
+    """Resample audio.
+    
+    The fixed ratios used by the bridge (2x up, 3x down) on int16 audio take
+    dedicated fast paths. Everything else falls back to vectorized linear
+    interpolation.
     
     Args:
         audio: Input audio samples
@@ -112,32 +273,200 @@ def resample(audio: np.ndarray, from_rate: int, to_rate: int) -> np.ndarray:
     """
     if from_rate == to_rate:
         return audio
-        
+
+    if audio.dtype == np.int16:
+        if to_rate == 2 * from_rate:
+            return _upsample_2x_int16(audio)
+        if from_rate == 3 * to_rate:
+            return _downsample_3x_int16(audio)
+    
     # Calculate new length
     new_length = int(len(audio) * to_rate / from_rate)
+    if len(audio) == 0 or new_length == 0:
+        return np.empty(new_length, dtype=audio.dtype)
     
-    # Linear interpolation
-    x_old = np.linspace(0, 1, len(audio))
-    x_new = np.linspace(0, 1, new_length)
+    # Linear interpolation between the two nearest source samples, with the
+    # first and last samples aligned as before
+    step = (len(audio) - 1) / max(new_length - 1, 1)
+    position = np.arange(new_length, dtype=np.float32) * np.float32(step)
+    i0 = position.astype(np.int32)
+    frac = position - i0
+    i1 = np.minimum(i0 + 1, len(audio) - 1)
     
-    return np.interp(x_new, x_old, audio).astype(audio.dtype)
+    x0 = audio[i0].astype(np.float32)
+    return (x0 + (audio[i1] - x0) * frac).astype(audio.dtype)
+
 
+# --- Fused kernels for the bridge's fixed Twilio ↔ Gemini rates ---
 
-def twilio_audio_to_pcm16(payload: str, target_rate: int = 16000) -> np.ndarray:
+def ulaw_decode_upsample2x(
+    ulaw_bytes: bytes,
+    prev: int = 0,
+    out: np.ndarray | None = None,
+    work: np.ndarray | None = None,
+) -> tuple[np.ndarray, int]:
+    """Decode 8kHz μ-law straight into 16kHz PCM16.
+    
+    Each decoded sample is preceded by its midpoint with the previous one.
+    The table lookup writes straight into the odd slots of the output, so
+    the decoded 8kHz samples never exist as a separate array. Computing the
+    midpoints needs one int16 temporary of the input length; passing
+    ``work`` supplies it, otherwise it is allocated per call. Carrying
+    ``prev`` between packets keeps the interpolation continuous across
+    packet boundaries.
+    
+    Args:
+        ulaw_bytes: Raw μ-law encoded bytes at 8kHz
+        prev: Last decoded sample of the previous packet
+        out: Optional int16 buffer of at least twice the input length to
+            reuse across calls
+        work: Optional int16 buffer of at least the input length for the
+            midpoint temporary
+        
+    Returns:
+        Tuple of (PCM16 samples at 16kHz, carry for the next packet); the
+        samples are a view into ``out`` when given
+    """
+    ulaw_array = np.frombuffer(ulaw_bytes, dtype=np.uint8)
+    n = len(ulaw_array)
+    if out is None:
+        out = np.empty(2 * n, dtype=np.int16)
+    out = out[: 2 * n]
+    if n == 0:
+        return out, prev
+    
+    decoded = out[1::2]
+    np.take(ULAW_DECODE_TABLE, ulaw_array, out=decoded, mode="clip")
+    _fill_midpoints(out, prev, work)
+    
+    return out, int(decoded[-1])
+
+
+def downsample3x_ulaw_encode(pcm16: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """Decimate 24kHz PCM16 and encode straight to 8kHz μ-law.
+    
+    Args:
+        pcm16: PCM16 samples at 24kHz
+        out: Optional uint8 buffer of at least a third of the input length
+            to reuse across calls
+        
+    Returns:
+        μ-law codes at 8kHz as uint8 (a view into ``out`` when given)
+    """
+    decimated = _downsample_3x_int16(pcm16)
+    n = len(decimated)
+    if out is None:
+        out = np.empty(n, dtype=np.uint8)
+    out = out[:n]
+    
+    return _encode_ulaw_into(decimated, out)
+
+
+def _reserve(buf: np.ndarray, size: int) -> np.ndarray:
+    """Return ``buf`` if it holds ``size`` items, else a larger replacement."""
+    if len(buf) >= size:
+        return buf
+    return np.empty(max(size, 2 * len(buf)), dtype=buf.dtype)
+
+
+class AudioScratch:
+    """Per-connection scratch buffers reused across audio packets.
+    
+    Holds the output arrays of each conversion: the 8kHz decode (which
+    doubles as the midpoint temporary when upsampling to 16kHz), the 16kHz
+    upsample and the outgoing μ-law codes. Buffers are sized for typical
+    packets up front and grow (never shrink) if a larger packet arrives.
+    
+    Only those outputs are reused. Base64 decoding still returns a new
+    bytes object, and the 24kHz decimator still allocates its padded
+    input, phase copy and filter intermediates on every packet.
+    """
+
+    def __init__(self, max_ulaw_bytes: int = 1024, max_pcm_samples: int = 8192):
+        """Initialize the scratch buffers.
+        
+        Args:
+            max_ulaw_bytes: Expected largest μ-law packet (8kHz samples)
+            max_pcm_samples: Expected largest PCM packet from the AI (24kHz samples)
+        """
+        self.decode = np.empty(max_ulaw_bytes, dtype=np.int16)
+        self.up = np.empty(2 * max_ulaw_bytes, dtype=np.int16)
+        self.ulaw = np.empty(max_pcm_samples // 3 + 1, dtype=np.uint8)
+        
+        # Last decoded 8kHz sample, carried across packets by the upsampler
+        self.upsample_carry = 0
+
+    def decode_buffer(self, size: int) -> np.ndarray:
+        """int16 buffer for decoded 8kHz samples."""
+        self.decode = _reserve(self.decode, size)
+        return self.decode
+
+    def upsample_buffer(self, size: int) -> np.ndarray:
+        """int16 buffer for 16kHz samples."""
+        self.up = _reserve(self.up, size)
+        return self.up
+
+    def ulaw_buffer(self, size: int) -> np.ndarray:
+        """uint8 buffer for outgoing μ-law codes."""
+        self.ulaw = _reserve(self.ulaw, size)
+        return self.ulaw
+
+
+def twilio_audio_to_pcm16(
+    payload: str,
+    target_rate: int = 16000,
+    scratch: AudioScratch | None = None,
+) -> np.ndarray:
     """Convert Twilio base64 μ-law audio to PCM16.
     
     Args:
         payload: Base64-encoded μ-law audio from Twilio
         target_rate: Target sample rate (default 16kHz for Gemini)
+        scratch: Optional per-connection buffers and upsampler state; the
+            result is then a view that is only valid until the next call
+            with the same scratch
+        
+    Returns:
+        PCM16 samples at target rate
+    """
+    return decode_twilio_ulaw(binascii.a2b_base64(payload), target_rate, scratch)
+
+
+def decode_twilio_ulaw(
+    ulaw_bytes: bytes | bytearray,
+    target_rate: int = 16000,
+    scratch: AudioScratch | None = None,
+) -> np.ndarray:
+    """Convert raw 8kHz μ-law (already base64-decoded) to PCM16.
+    
+    Lets callers batch several Twilio packets into one conversion, so the
+    per-call NumPy overhead is paid once per batch instead of per packet.
+    
+    Args:
+        ulaw_bytes: Raw μ-law encoded bytes at 8kHz
+        target_rate: Target sample rate (default 16kHz for Gemini)
+        scratch: Optional per-connection buffers and upsampler state; the
+            result is then a view that is only valid until the next call
+            with the same scratch
         
     Returns:
         PCM16 samples at target rate
     """
-    # Decode base64
-    ulaw_bytes = base64.b64decode(payload)
+    if target_rate == 16000:
+        if scratch is None:
+            return ulaw_decode_upsample2x(ulaw_bytes)[0]
+        out = scratch.upsample_buffer(2 * len(ulaw_bytes))
+        # The 8kHz decode buffer is idle on this path; it holds the
+        # midpoint temporary instead
+        work = scratch.decode_buffer(len(ulaw_bytes))
+        pcm16, scratch.upsample_carry = ulaw_decode_upsample2x(
+            ulaw_bytes, scratch.upsample_carry, out=out, work=work
+        )
+        return pcm16
     
     # Convert to PCM16
-    pcm16 = ulaw_to_pcm16(ulaw_bytes)
+    out = scratch.decode_buffer(len(ulaw_bytes)) if scratch else None
+    pcm16 = ulaw_to_pcm16(ulaw_bytes, out=out)
     
     # Resample from 8kHz to target
     if target_rate != 8000:
@@ -146,22 +475,140 @@ def twilio_audio_to_pcm16(payload: str, target_rate: int = 16000) -> np.ndarray:
     return pcm16
 
 
-def pcm16_to_twilio_audio(pcm16: np.ndarray, source_rate: int = 24000) -> str:
+def pcm16_to_twilio_audio(
+    pcm16: bytes | memoryview | np.ndarray,
+    source_rate: int = 24000,
+    scratch: AudioScratch | None = None,
+) -> str:
     """Convert PCM16 to Twilio-compatible base64 μ-law.
     
     Args:
-        pcm16: PCM16 samples
+        pcm16: PCM16 samples, or raw PCM16 bytes (e.g. straight from
+            Gemini), which are viewed in place rather than copied
         source_rate: Source sample rate (default 24kHz from Gemini)
+        scratch: Optional per-connection buffers
         
     Returns:
         Base64-encoded μ-law audio for Twilio
     """
-    # Resample to 8kHz
-    if source_rate != 8000:
-        pcm16 = resample(pcm16, source_rate, 8000)
+    if not isinstance(pcm16, np.ndarray):
+        pcm16 = np.frombuffer(pcm16, dtype=np.int16)
     
-    # Convert to μ-law
-    ulaw_bytes = pcm16_to_ulaw(pcm16)
+    if source_rate == 24000 and pcm16.dtype == np.int16:
+        out = scratch.ulaw_buffer(len(pcm16) // 3) if scratch else None
+        ulaw_bytes = downsample3x_ulaw_encode(pcm16, out=out)
+    else:
+        # Resample to 8kHz
+        if source_rate != 8000:
+            pcm16 = resample(pcm16, source_rate, 8000)
+        
+        # Convert to μ-law
+        ulaw_bytes = pcm16_to_ulaw(pcm16)
     
     # Base64 encode
-    return base64.b64encode(ulaw_bytes).decode("ascii")
+    return binascii.b2a_base64(ulaw_bytes, newline=False).decode("ascii")
+
+
+# --- Bytes-in/bytes-out helpers for the streaming server ---
+
+def twilio_audio_to_pcm16_bytes(
+    payload: str,
+    state: int | None = None,
+    target_rate: int = 16000,
+) -> tuple[bytes, int | None]:
+    """Convert Twilio base64 μ-law audio to PCM16 bytes.
+    
+    At 16kHz the decode and 2x upsample run as one fused pass; other rates
+    decode and then resample each packet independently.
+    
+    Args:
+        payload: Base64-encoded μ-law audio from Twilio
+        state: Interpolation carry from the previous packet (None to start)
+        target_rate: Target sample rate (default 16kHz for Gemini)
+        
+    Returns:
+        Tuple of (PCM16 bytes at target rate, state for the next packet)
+    """
+    ulaw_bytes = binascii.a2b_base64(payload)
+    if target_rate == 16000:
+        pcm, state = ulaw_decode_upsample2x(ulaw_bytes, state or 0)
+        return pcm.tobytes(), state
+    return resample(ulaw_to_pcm16(ulaw_bytes), 8000, target_rate).tobytes(), state
+
+
+def downsample_24k_to_8k(
+    pcm: bytes,
+    tail: np.ndarray | None = None,
+) -> tuple[bytes, np.ndarray]:
+    """Decimate streaming 24kHz PCM16 to 8kHz with the anti-alias FIR.
+    
+    Unlike plain linear interpolation, the low-pass removes
+    content above 4kHz before every third sample is kept, so it doesn't
+    fold back into the band as rasp. The input samples that the next
+    packet still needs (the filter history plus any remainder that
+    doesn't fill a whole output sample) are carried in ``tail``, so
+    arbitrary packet sizes decimate seamlessly. The filter is linear
+    phase, so it delays the output by (15 - 1) / 2 = 7 input samples
+    (~0.3ms at 24kHz); only the outputs that are kept are computed.
+    
+    Args:
+        pcm: PCM16 bytes at 24kHz
+        tail: Carry from the previous packet (None to start)
+        
+    Returns:
+        Tuple of (PCM16 bytes at 8kHz, carry for the next packet)
+    """
+    history = len(_DECIMATE_3X_TAPS_I32) - 1
+    if tail is None:
+        tail = np.zeros(history, dtype=np.int16)
+    
+    buf = np.concatenate([tail, np.frombuffer(pcm, dtype=np.int16)])
+    n_out = (len(buf) - history) // 3
+    if n_out <= 0:
+        return b"", buf
+    
+    return _decimate_3x(buf, n_out).tobytes(), buf[3 * n_out :]
+
+
+def pcm16_bytes_to_ulaw(
+    pcm: bytes,
+    state: np.ndarray | None = None,
+) -> tuple[bytes, np.ndarray]:
+    """Convert 24kHz PCM16 bytes to 8kHz μ-law bytes.
+    
+    Args:
+        pcm: PCM16 bytes at 24kHz (Gemini's output rate)
+        state: Decimator carry from the previous packet (None to start)
+        
+    Returns:
+        Tuple of (μ-law bytes at 8kHz, state for the next packet)
+    """
+    pcm_8k, state = downsample_24k_to_8k(pcm, state)
+    return pcm16_to_ulaw(np.frombuffer(pcm_8k, dtype=np.int16)), state
+
+
+def twilio_payload_to_ulaw(payload: str) -> bytes:
+    """Decode the base64 payload of a Twilio media message to μ-law bytes."""
+    return binascii.a2b_base64(payload)
+
+
+def ulaw_to_twilio_payload(ulaw_bytes: bytes) -> str:
+    """Base64-encode μ-law bytes for a Twilio media message."""
+    return binascii.b2a_base64(ulaw_bytes, newline=False).decode("ascii")
+
+
+def pcm16_bytes_to_twilio_audio(
+    pcm: bytes,
+    state: np.ndarray | None = None,
+) -> tuple[str, np.ndarray]:
+    """Convert 24kHz PCM16 bytes to Twilio-compatible base64 μ-law.
+    
+    Args:
+        pcm: PCM16 bytes at 24kHz (Gemini's output rate)
+        state: Decimator carry from the previous packet (None to start)
+        
+    Returns:
+        Tuple of (base64-encoded μ-law audio for Twilio, state for the next packet)
+    """
+    mulaw, state = pcm16_bytes_to_ulaw(pcm, state)
+    return ulaw_to_twilio_payload(mulaw), state
@@ -3,6 +3,17 @@
 import argparse
 import sys
 
+# uvicorn settings shared by every entry point. uvloop and httptools are
+# the C-accelerated event loop and HTTP parser from uvicorn[standard];
+# uvloop doesn't support Windows.
+UVICORN_OPTIONS = {
+    "loop": "asyncio" if sys.platform == "win32" else "uvloop",
+    "http": "httptools",
+    # Media frames are base64 μ-law that barely compresses; deflate only
+    # adds per-frame CPU and latency on /media-stream
+    "ws_per_message_deflate": False,
+}
+
 
 def main():
     """Main CLI entry point."""
@@ -36,6 +47,7 @@ def main():
         host=args.host,
         port=args.port,
         reload=args.reload,
+        **UVICORN_OPTIONS,
     )
 
 
@@ -1,7 +1,6 @@
 """Configuration management."""
 
-import os
-from pathlib import Path
+from functools import lru_cache
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -27,6 +26,9 @@ class Settings(BaseSettings):
     # Gemini
     gemini_api_key: str = Field(default="", alias="GEMINI_API_KEY")
     gemini_model: str = Field(default="gemini-2.0-flash-exp", alias="GEMINI_MODEL")
+    # Live sessions kept connected ahead of calls (0 connects per call)
+    gemini_warm_sessions: int = Field(default=0, alias="GEMINI_WARM_SESSIONS")
+    gemini_warm_max_idle: float = Field(default=60.0, alias="GEMINI_WARM_MAX_IDLE")
     
     # OpenAI
     openai_api_key: str = Field(default="", alias="OPENAI_API_KEY")
@@ -48,13 +50,7 @@ class Settings(BaseSettings):
     )
 
 
-# Singleton
-_settings: Settings | None = None
-
-
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Get application settings."""
-    global _settings
-    if _settings is None:
-        _settings = Settings()
-    return _settings
+    """Get application settings (loaded once, then cached)."""
+    return Settings()
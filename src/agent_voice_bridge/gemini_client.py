@@ -2,8 +2,10 @@
 
 import asyncio
 import logging
+import time
 from typing import AsyncIterator
 
+import numpy as np
 from google import genai
 from google.genai import types
 
@@ -79,22 +81,20 @@ class GeminiLiveClient:
         Args:
             audio_bytes: PCM16 audio at 16kHz
         """
-        import struct
-        import time
-        
         if not self._session:
             logger.warning("Cannot send audio - not connected")
             return
         
-        # Calculate audio level for debugging
+        # Calculate audio level for debugging, only when it will be logged
         if len(audio_bytes) >= 2:
-            samples = struct.unpack(f'{len(audio_bytes)//2}h', audio_bytes)
-            max_level = max(abs(s) for s in samples)
-            avg_level = sum(abs(s) for s in samples) // len(samples)
-            
             self._audio_chunks_sent += 1
             now = time.time()
-            if now - self._last_audio_log > 2.0:  # Log every 2 seconds
+            # Log every 2 seconds
+            if now - self._last_audio_log > 2.0 and logger.isEnabledFor(logging.INFO):
+                samples = np.frombuffer(audio_bytes, dtype=np.int16, count=len(audio_bytes) // 2)
+                levels = np.abs(samples.astype(np.int32))
+                max_level = int(levels.max())
+                avg_level = int(levels.mean())
                 logger.info(f"🎤 Audio stats: chunks={self._audio_chunks_sent}, max={max_level}, avg={avg_level}")
                 self._last_audio_log = now
             
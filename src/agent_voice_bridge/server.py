@@ -1,19 +1,26 @@
 """FastAPI server for voice bridge - Twilio + Gemini Live API."""
 
 import asyncio
-import audioop
-import base64
-import json
+import functools
+import html
 import logging
-import os
 from contextlib import asynccontextmanager
 
+import msgspec
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import Response
 from google import genai
 from google.genai import types
 
-from agent_voice_bridge.config import Settings, get_settings
+from agent_voice_bridge.audio import (
+    AudioScratch,
+    decode_twilio_ulaw,
+    pcm16_bytes_to_ulaw,
+    twilio_payload_to_ulaw,
+    ulaw_to_twilio_payload,
+)
+from agent_voice_bridge.config import get_settings
+from agent_voice_bridge.session_pool import GeminiSessionPool
 
 # Configure logging
 logging.basicConfig(
@@ -23,12 +30,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger("voice-bridge")
 
+# Twilio connects here for the call audio; also advertised in the TwiML
+MEDIA_STREAM_PATH = "/media-stream"
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     logger.info("Voice Bridge starting...")
+    settings = get_settings()
+    # One Gemini client for the whole process so calls share its HTTP
+    # connection pool instead of each building their own
+    app.state.gemini = genai.Client(api_key=settings.gemini_api_key)
+    
+    # Optionally keep Live sessions connected ahead of calls
+    app.state.gemini_pool = None
+    if settings.gemini_warm_sessions > 0:
+        app.state.gemini_pool = GeminiSessionPool(
+            app.state.gemini,
+            model=settings.gemini_model,
+            config=_live_connect_config(),
+            size=settings.gemini_warm_sessions,
+            max_idle=settings.gemini_warm_max_idle,
+        )
+        app.state.gemini_pool.start()
+        logger.info(f"🔥 Keeping {settings.gemini_warm_sessions} Gemini sessions warm")
+    
     yield
+    
+    if app.state.gemini_pool is not None:
+        await app.state.gemini_pool.close()
     logger.info("Voice Bridge shutting down...")
 
 
@@ -46,71 +77,79 @@ async def health():
     return {"status": "ok"}
 
 
-@app.post("/incoming")
-async def incoming_call(request: Request):
-    """Handle incoming Twilio call - return TwiML to start media stream."""
+@functools.cache
+def _twiml_parts() -> tuple[str, str]:
+    """Build the TwiML around the caller parameter, which is all that varies."""
     settings = get_settings()
     
-    form = await request.form()
-    caller = form.get("From", "unknown")
-    call_sid = form.get("CallSid", "unknown")
-    logger.info(f"📞 INCOMING CALL from {caller} (CallSid: {call_sid})")
-    
     # Build WebSocket URL
     ws_url = settings.public_url.replace("https://", "wss://").replace("http://", "ws://")
-    ws_url = f"{ws_url}/media-stream"
+    ws_url = f"{ws_url}{MEDIA_STREAM_PATH}"
     logger.info(f"📡 WebSocket URL: {ws_url}")
     
     # Skip the <Say> greeting - Gemini will speak first based on system prompt
     twiml = f"""<?xml version="1.0" encoding="UTF-8"?>
 <Response>
     <Connect>
-        <Stream url="{ws_url}">
-            <Parameter name="caller" value="{caller}" />
+        <Stream url="{html.escape(ws_url, quote=True)}">
+            <Parameter name="caller" value="{{caller}}" />
         </Stream>
     </Connect>
 </Response>"""
+    prefix, suffix = twiml.split("{caller}")
+    return prefix, suffix
+
+
+@app.post("/incoming")
+async def incoming_call(request: Request):
+    """Handle incoming Twilio call - return TwiML to start media stream."""
+    form = await request.form()
+    caller = form.get("From", "unknown")
+    call_sid = form.get("CallSid", "unknown")
+    logger.info(f"📞 INCOMING CALL from {caller} (CallSid: {call_sid})")
+    
+    prefix, suffix = _twiml_parts()
+    twiml = prefix + html.escape(caller, quote=True) + suffix
     
     return Response(content=twiml, media_type="application/xml")
 
 
-# --- Audio Processing (using audioop for reliability) ---
+# --- WebSocket Handler ---
 
-def process_incoming_audio(chunk: bytes, state) -> tuple[bytes, any]:
-    """Convert Twilio μ-law 8kHz to PCM 16kHz for Gemini."""
-    # μ-law to PCM at 8kHz
-    pcm_8k = audioop.ulaw2lin(chunk, 2)
-    # Upsample 8kHz to 16kHz
-    pcm_16k, new_state = audioop.ratecv(pcm_8k, 2, 1, 8000, 16000, state)
-    return pcm_16k, new_state
+# Format of caller audio streamed to Gemini
+GEMINI_INPUT_MIME = "audio/pcm;rate=16000"
 
 
-def process_outgoing_audio(audio_data: bytes, state) -> tuple[str, any]:
-    """Convert Gemini PCM 24kHz to Twilio μ-law 8kHz base64."""
-    # Downsample 24kHz to 8kHz
-    pcm_8k, new_state = audioop.ratecv(audio_data, 2, 1, 24000, 8000, state)
-    # PCM to μ-law
-    mulaw = audioop.lin2ulaw(pcm_8k, 2)
-    # Base64 encode
-    return base64.b64encode(mulaw).decode("utf-8"), new_state
+class TwilioStart(msgspec.Struct, rename="camel"):
+    """Body of a Twilio ``start`` event."""
 
+    stream_sid: str = ""
+    custom_parameters: dict[str, str] = {}
 
-# --- WebSocket Handler ---
 
-@app.websocket("/media-stream")
-async def media_stream(websocket: WebSocket):
-    """Handle Twilio media stream WebSocket."""
-    await websocket.accept()
-    logger.info("📱 Twilio WebSocket connected")
-    
-    settings = get_settings()
-    stream_sid: str | None = None
-    
-    # Initialize Gemini client
-    client = genai.Client(api_key=settings.gemini_api_key)
-    
-    config = types.LiveConnectConfig(
-        system_instruction=settings.system_prompt,
+class TwilioMedia(msgspec.Struct):
+    """Body of a Twilio ``media`` event."""
+
+    payload: str = ""
+
+
+class TwilioFrame(msgspec.Struct):
+    """A Twilio Media Streams message; fields we don't use are skipped."""
+
+    event: str = ""
+    start: TwilioStart | None = None
+    media: TwilioMedia | None = None
+
+
+# Decodes straight into the structs, with no intermediate dicts
+_decode_twilio_frame = msgspec.json.Decoder(TwilioFrame).decode
+
+
+@functools.cache
+def _live_connect_config() -> types.LiveConnectConfig:
+    """Build the Gemini Live session config, which is the same for every call."""
+    return types.LiveConnectConfig(
+        system_instruction=get_settings().system_prompt,
         response_modalities=["AUDIO"],
         speech_config=types.SpeechConfig(
             voice_config=types.VoiceConfig(
@@ -120,34 +159,199 @@ async def media_stream(websocket: WebSocket):
             )
         )
     )
+
+
+class _StreamContext:
+    """Per-call state shared by the Twilio event handlers."""
+
+    # Caller audio is staged as raw μ-law and converted in one pass per
+    # ~300ms send (2400 bytes at 8kHz → 9600 bytes of PCM16 at 16kHz),
+    # so the decode/upsample overhead is paid once per batch rather than
+    # per 20ms packet. Preallocated once and filled through a write
+    # cursor, so packets never resize it.
+    ULAW_BATCH_BYTES = 2400
+
+    def __init__(self, session):
+        self.session = session
+        self.stream_sid: str | None = None
+        # The outbound media message has a fixed shape, so its JSON is
+        # built around the payload once the streamSid is known
+        self.media_prefix: str | None = None
+        # Per-stream decode buffers and upsampler carry, created on "start"
+        self.scratch: AudioScratch | None = None
+        self.ulaw_buffer = bytearray(self.ULAW_BATCH_BYTES)
+        self.buffered = 0
+        self.audio_sends = 0
+        self.stopped = False
+
+
+async def _on_connected(ctx: _StreamContext, frame: TwilioFrame):
+    """Log the connected event that opens every Twilio stream."""
+    logger.info("Twilio stream connected")
+
+
+async def _on_start(ctx: _StreamContext, frame: TwilioFrame):
+    """Record the stream and set up its per-call buffers."""
+    start = frame.start or TwilioStart()
+    ctx.stream_sid = start.stream_sid
+    if ctx.stream_sid:
+        # msgspec escapes the sid, so the prefix is valid JSON whatever
+        # Twilio sends
+        ctx.media_prefix = (
+            '{"event":"media","streamSid":'
+            + msgspec.json.encode(ctx.stream_sid).decode()
+            + ',"media":{"payload":"'
+        )
+    caller = start.custom_parameters.get("caller", "unknown")
+    logger.info(f"📞 Stream started: {ctx.stream_sid[:20]}... from {caller}")
+    ctx.scratch = AudioScratch(max_ulaw_bytes=ctx.ULAW_BATCH_BYTES)
+
+
+async def _on_media(ctx: _StreamContext, frame: TwilioFrame):
+    """Stage caller audio and send each full batch to Gemini."""
+    payload = frame.media.payload if frame.media else ""
+    if not payload or ctx.scratch is None:
+        return
+    
+    ulaw_buffer = ctx.ulaw_buffer
+    batch_bytes = ctx.ULAW_BATCH_BYTES
+    ulaw_view = memoryview(twilio_payload_to_ulaw(payload))
+    
+    while ulaw_view:
+        n = min(len(ulaw_view), batch_bytes - ctx.buffered)
+        ulaw_buffer[ctx.buffered:ctx.buffered + n] = ulaw_view[:n]
+        ctx.buffered += n
+        ulaw_view = ulaw_view[n:]
+        
+        # Convert and send the batch to Gemini
+        if ctx.buffered < batch_bytes:
+            continue
+        pcm_16k = decode_twilio_ulaw(ulaw_buffer, scratch=ctx.scratch)
+        audio_bytes = pcm_16k.tobytes()
+        ctx.buffered = 0
+        
+        ctx.audio_sends += 1
+        if ctx.audio_sends % 10 == 1:
+            # Log audio level to debug if we're sending silence; only
+            # measured on the sends that are logged
+            max_amp = max(int(pcm_16k.max()), -int(pcm_16k.min()))
+            logger.info(f"🎤 Sending to Gemini: {len(audio_bytes)} bytes, max_amp={max_amp}")
+        
+        await ctx.session.send_realtime_input(
+            audio=types.Blob(mime_type=GEMINI_INPUT_MIME, data=audio_bytes)
+        )
+
+
+async def _on_stop(ctx: _StreamContext, frame: TwilioFrame):
+    """End the stream when the call hangs up."""
+    logger.info("Stream stopped")
+    ctx.stopped = True
+
+
+# Twilio events other than "media", which the read loop handles first since
+# it is nearly every frame; unknown events are ignored
+_EVENT_HANDLERS = {
+    "connected": _on_connected,
+    "start": _on_start,
+    "stop": _on_stop,
+}
+
+
+@app.websocket(MEDIA_STREAM_PATH)
+async def media_stream(websocket: WebSocket):
+    """Handle Twilio media stream WebSocket."""
+    await websocket.accept()
+    logger.info("📱 Twilio WebSocket connected")
     
-    logger.info(f"🤖 Connecting to Gemini ({settings.gemini_model})...")
+    settings = get_settings()
     
-    async with client.aio.live.connect(
-        model=settings.gemini_model,
-        config=config,
-    ) as session:
+    # Lease a pre-connected session when the pool is enabled
+    pool: GeminiSessionPool | None = websocket.app.state.gemini_pool
+    if pool is not None:
+        connection = pool.session()
+    else:
+        client: genai.Client = websocket.app.state.gemini
+        logger.info(f"🤖 Connecting to Gemini ({settings.gemini_model})...")
+        connection = client.aio.live.connect(
+            model=settings.gemini_model,
+            config=_live_connect_config(),
+        )
+    
+    async with connection as session:
         logger.info("✅ Connected to Gemini")
         
         # Shared state
-        stream_info = {"sid": None}
-        downsample_state = None
+        ctx = _StreamContext(session)
+        MEDIA_SUFFIX = '"}}'
+        
+        # Gemini audio is handed to a separate writer task, so converting and
+        # sending to Twilio never holds up reading the next Gemini message.
+        # None marks the end of a turn. Bounded to apply backpressure if
+        # Twilio falls behind.
+        outgoing_audio: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=32)
+        
+        # Outgoing μ-law is coalesced into whole 20ms frames (160 bytes at
+        # 8kHz) so small Gemini chunks don't each cost a WebSocket message.
+        # Every chunk already queued is folded into the same send, so one
+        # Twilio media message can carry several frames.
+        TWILIO_FRAME_BYTES = 160
         
         async def send_to_twilio(b64_audio: str):
             """Send audio back to Twilio."""
-            nonlocal downsample_state
-            if not stream_info["sid"]:
+            prefix = ctx.media_prefix
+            if not prefix:
                 return
-            await websocket.send_json({
-                "event": "media",
-                "streamSid": stream_info["sid"],
-                "media": {"payload": b64_audio},
-            })
+            # Base64 is plain ASCII, so it needs no JSON escaping; Twilio
+            # expects text frames
+            await websocket.send_text(prefix + b64_audio + MEDIA_SUFFIX)
         
-        async def gemini_receiver():
-            """Receive audio from Gemini and send to Twilio."""
-            nonlocal downsample_state
+        async def twilio_writer():
+            """Convert queued Gemini audio and send it to Twilio."""
+            downsample_state = None
+            twilio_buffer = bytearray()
             chunks_sent = 0
+            
+            async def flush_to_twilio(min_bytes: int):
+                """Send the buffered μ-law, in whole frames down to ``min_bytes``."""
+                nonlocal chunks_sent
+                n = len(twilio_buffer)
+                if min_bytes:
+                    n -= n % min_bytes
+                if not n:
+                    return
+                await send_to_twilio(ulaw_to_twilio_payload(twilio_buffer[:n]))
+                del twilio_buffer[:n]
+                chunks_sent += 1
+                if chunks_sent % 20 == 1:
+                    logger.info(f"📤 Sent {chunks_sent} audio chunks to Twilio")
+            
+            try:
+                while True:
+                    audio_data = await outgoing_audio.get()
+                    turn_complete = False
+                    # Drain whatever else queued up while we were sending, so
+                    # a burst of Gemini chunks goes out as one media message
+                    while True:
+                        if audio_data is None:
+                            turn_complete = True
+                        else:
+                            mulaw, downsample_state = pcm16_bytes_to_ulaw(
+                                audio_data, downsample_state
+                            )
+                            twilio_buffer.extend(mulaw)
+                        try:
+                            audio_data = outgoing_audio.get_nowait()
+                        except asyncio.QueueEmpty:
+                            break
+                    # Don't hold back the end of the turn waiting for a full frame
+                    await flush_to_twilio(0 if turn_complete else TWILIO_FRAME_BYTES)
+            except asyncio.CancelledError:
+                logger.info("Twilio writer cancelled")
+            except Exception as e:
+                logger.error(f"Twilio writer error: {e}")
+        
+        async def gemini_receiver():
+            """Receive audio from Gemini and queue it for Twilio."""
             try:
                 # Keep looping - the receive iterator may complete after each turn
                 while True:
@@ -160,19 +364,13 @@ async def media_stream(websocket: WebSocket):
                         if model_turn and model_turn.parts:
                             for part in model_turn.parts:
                                 if part.inline_data and part.inline_data.data:
-                                    audio_data = part.inline_data.data
-                                    b64_audio, downsample_state = process_outgoing_audio(
-                                        audio_data, downsample_state
-                                    )
-                                    await send_to_twilio(b64_audio)
-                                    chunks_sent += 1
-                                    if chunks_sent % 20 == 1:
-                                        logger.info(f"📤 Sent {chunks_sent} audio chunks to Twilio")
+                                    await outgoing_audio.put(part.inline_data.data)
                                 # Log any text/transcript from Gemini
                                 if hasattr(part, 'text') and part.text:
                                     logger.info(f"🤖 Gemini said: {part.text}")
                         
                         if response.server_content.turn_complete:
+                            await outgoing_audio.put(None)
                             logger.info("🔄 Gemini turn complete")
                     
                     # Log input transcripts (what user said)
@@ -190,8 +388,9 @@ async def media_stream(websocket: WebSocket):
             except Exception as e:
                 logger.error(f"Gemini receiver error: {e}")
         
-        # Start receiver task
+        # Start receiver and writer tasks
         receive_task = asyncio.create_task(gemini_receiver())
+        writer_task = asyncio.create_task(twilio_writer())
         
         # Send initial prompt to start conversation
         async def send_initial_prompt():
@@ -204,83 +403,56 @@ async def media_stream(websocket: WebSocket):
         
         asyncio.create_task(send_initial_prompt())
         
-        # Audio buffer (send every ~300ms = 9600 bytes at 16kHz)
-        audio_buffer = bytearray()
-        upsample_state = None
-        BUFFER_SIZE = 9600  # ~300ms at 16kHz, 16-bit
-        
         try:
-            async for message in websocket.iter_text():
-                data = json.loads(message)
-                event = data.get("event")
-                
-                if event == "connected":
-                    logger.info("Twilio stream connected")
-                    
-                elif event == "start":
-                    start_data = data.get("start", {})
-                    stream_info["sid"] = start_data.get("streamSid")
-                    params = start_data.get("customParameters", {})
-                    caller = params.get("caller", "unknown")
-                    logger.info(f"📞 Stream started: {stream_info['sid'][:20]}... from {caller}")
-                    
-                elif event == "media":
-                    payload = data.get("media", {}).get("payload", "")
-                    if payload:
-                        chunk = base64.b64decode(payload)
-                        pcm_16k, upsample_state = process_incoming_audio(chunk, upsample_state)
-                        audio_buffer.extend(pcm_16k)
-                        
-                        # Send buffered audio to Gemini
-                        if len(audio_buffer) >= BUFFER_SIZE:
-                            audio_bytes = bytes(audio_buffer)
-                            
-                            # Log audio level to debug if we're sending silence
-                            import struct
-                            samples = struct.unpack(f'{len(audio_bytes)//2}h', audio_bytes)
-                            max_amp = max(abs(s) for s in samples)
-                            
-                            if not hasattr(session, '_audio_sends'):
-                                session._audio_sends = 0
-                            session._audio_sends += 1
-                            if session._audio_sends % 10 == 1:
-                                logger.info(f"🎤 Sending to Gemini: {len(audio_bytes)} bytes, max_amp={max_amp}")
-                            
-                            await session.send(
-                                input={
-                                    "data": audio_bytes,
-                                    "mime_type": "audio/pcm;rate=16000"
-                                },
-                                end_of_turn=False
-                            )
-                            audio_buffer.clear()
-                            
-                elif event == "stop":
-                    logger.info("Stream stopped")
+            while True:
+                # Use receive() so msgspec can parse either the text or the
+                # bytes field; the UTF-8 decode still happens in Starlette
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    logger.info("Twilio WebSocket disconnected")
                     break
+                raw = message.get("text") or message.get("bytes")
+                if not raw:
+                    continue
+                frame = _decode_twilio_frame(raw)
+                
+                # Fast path: media is nearly every frame
+                if frame.event == "media":
+                    await _on_media(ctx, frame)
+                    continue
+                
+                handler = _EVENT_HANDLERS.get(frame.event)
+                if handler is not None:
+                    await handler(ctx, frame)
+                    if ctx.stopped:
+                        break
                     
         except WebSocketDisconnect:
             logger.info("Twilio WebSocket disconnected")
         except Exception as e:
             logger.error(f"Media stream error: {e}")
         finally:
-            receive_task.cancel()
-            try:
-                await receive_task
-            except asyncio.CancelledError:
-                pass
+            for task in (receive_task, writer_task):
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
             logger.info("Media stream closed")
 
 
 def main():
     """Run the server."""
     import uvicorn
+
+    from agent_voice_bridge.cli import UVICORN_OPTIONS
     settings = get_settings()
     uvicorn.run(
         "agent_voice_bridge.server:app",
         host=settings.server_host,
         port=settings.server_port,
         reload=True,
+        **UVICORN_OPTIONS,
     )
 
 
@@ -0,0 +1,196 @@
+"""Pre-connected Gemini Live sessions for incoming calls.
+
+Connecting to Gemini Live costs a TLS + WebSocket handshake before the
+assistant can say anything. The pool keeps a few sessions connected ahead
+of time so a call can start on one immediately.
+
+Live sessions carry conversation state, so each one serves a single call
+and is closed afterwards; the pool only saves the connect, it never hands
+a used session to a second caller.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from google import genai
+from google.genai import types
+from websockets.protocol import State
+
+logger = logging.getLogger("voice-bridge.pool")
+
+# Delay before retrying after a warm connect fails, so an outage or a bad
+# key doesn't turn into a reconnect loop
+RETRY_DELAY = 5.0
+
+
+def _websocket(session):
+    """The SDK session's underlying WebSocket, or None if it has none."""
+    return getattr(session, "_ws", None)
+
+
+def _is_open(session) -> bool:
+    """Whether the session's WebSocket can still be used."""
+    ws = _websocket(session)
+    return ws is None or ws.state is State.OPEN
+
+
+class _WarmSession:
+    """A connected session waiting in the pool."""
+
+    def __init__(self, session):
+        self.session = session
+        # Set when a call takes the session / when that call ends
+        self.leased = asyncio.Event()
+        self.released = asyncio.Event()
+
+
+class GeminiSessionPool:
+    """Keeps up to ``size`` Gemini Live sessions connected and ready to lease.
+
+    Each warm session is owned by its own task, which enters and exits the
+    SDK's ``connect()`` context, so a session is always closed by the task
+    that opened it. Idle sessions older than ``max_idle`` seconds are
+    closed and replaced before the server times them out, and one the
+    server closes first is dropped and replaced as soon as it closes. A
+    session is only leased while its connection is still open; otherwise
+    the call connects directly.
+    """
+
+    def __init__(
+        self,
+        client: genai.Client,
+        model: str,
+        config: types.LiveConnectConfig,
+        size: int,
+        max_idle: float = 60.0,
+    ):
+        """Initialize the pool (call start() to begin connecting).
+        
+        Args:
+            client: Shared Gemini client
+            model: Live model to connect to
+            config: Session config, the same for every call
+            size: Number of sessions to keep connected
+            max_idle: Seconds an unleased session may wait before reconnecting
+        """
+        self._client = client
+        self._model = model
+        self._config = config
+        self._size = size
+        self._max_idle = max_idle
+        
+        # Sessions waiting for a call, oldest first; each holder removes
+        # its own entry when it is leased, recycled or closed
+        self._ready: deque[_WarmSession] = deque()
+        self._tasks: set[asyncio.Task] = set()
+        self._closed = False
+
+    def start(self):
+        """Start connecting the warm sessions in the background."""
+        for _ in range(self._size):
+            self._spawn()
+
+    async def close(self):
+        """Close all warm sessions, including any still leased."""
+        self._closed = True
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._ready.clear()
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator:
+        """Lease a connected session for one call.
+        
+        Falls back to connecting directly when no warm session is ready.
+        """
+        warm = self._take()
+        if warm is None:
+            async with self._client.aio.live.connect(
+                model=self._model,
+                config=self._config,
+            ) as session:
+                yield session
+            return
+        
+        # Top the pool back up while this call runs
+        self._spawn()
+        try:
+            yield warm.session
+        finally:
+            warm.released.set()
+
+    def _take(self) -> _WarmSession | None:
+        """Remove and return the oldest warm session still open, if any.
+        
+        Closed sessions are left for their holders, which drop and replace
+        them once they see the close.
+        """
+        warm = next((w for w in self._ready if _is_open(w.session)), None)
+        if warm is not None:
+            self._ready.remove(warm)
+            warm.leased.set()
+        return warm
+
+    def _spawn(self):
+        """Start a task that connects and holds one warm session."""
+        if self._closed:
+            return
+        task = asyncio.create_task(self._hold())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _hold(self):
+        """Connect one session, park it in the pool and close it when done."""
+        replace = True
+        try:
+            async with self._client.aio.live.connect(
+                model=self._model,
+                config=self._config,
+            ) as session:
+                warm = _WarmSession(session)
+                self._ready.append(warm)
+                logger.debug("Warm Gemini session ready")
+                
+                await self._wait_idle(warm)
+                
+                # Check the flag rather than what woke the wait: a call may
+                # have taken the session just as it expired
+                if warm.leased.is_set():
+                    # The lease already spawned a replacement
+                    replace = False
+                    await warm.released.wait()
+                else:
+                    self._ready.remove(warm)
+                    if _is_open(session):
+                        logger.debug("Recycling idle Gemini session")
+                    else:
+                        logger.debug("Warm Gemini session closed by server")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Warm Gemini session error: {e}")
+            await asyncio.sleep(RETRY_DELAY)
+        
+        if replace:
+            self._spawn()
+
+    async def _wait_idle(self, warm: _WarmSession):
+        """Wait until the session is leased, closed, or idle for max_idle."""
+        waiters = {asyncio.create_task(warm.leased.wait())}
+        ws = _websocket(warm.session)
+        if ws is not None:
+            waiters.add(asyncio.create_task(ws.wait_closed()))
+        try:
+            await asyncio.wait(
+                waiters,
+                timeout=self._max_idle,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
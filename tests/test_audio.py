@@ -5,9 +5,36 @@ import base64
 import math
 import struct
 
+import numpy as np
 import pytest
 
-from agent_voice_bridge.server import process_incoming_audio, process_outgoing_audio
+from agent_voice_bridge.audio import (
+    DECIMATE_3X_TAPS,
+    ULAW_DECODE_TABLE,
+    ULAW_ENCODE_TABLE,
+    AudioScratch,
+    decode_twilio_ulaw,
+    downsample3x_ulaw_encode,
+    downsample_24k_to_8k,
+    pcm16_bytes_to_twilio_audio,
+    pcm16_to_twilio_audio,
+    pcm16_to_ulaw,
+    resample,
+    twilio_audio_to_pcm16,
+    twilio_audio_to_pcm16_bytes,
+    ulaw_decode_upsample2x,
+    ulaw_to_pcm16,
+)
+
+
+def process_incoming_audio(chunk: bytes, state):
+    """Feed raw μ-law through the Twilio payload path."""
+    return twilio_audio_to_pcm16_bytes(base64.b64encode(chunk).decode(), state)
+
+
+def process_outgoing_audio(audio_data: bytes, state):
+    """Feed Gemini PCM through the Twilio payload path."""
+    return pcm16_bytes_to_twilio_audio(audio_data, state)
 
 
 class TestIncomingAudio:
@@ -127,6 +154,31 @@ class TestOutgoingAudio:
         assert state2 is not None
 
 
+class TestStreamingDecimator:
+    """Tests for the stateful 24kHz → 8kHz decimator."""
+
+    def test_split_packets_match_whole(self):
+        """Test odd packet sizes decimate the same as one long packet."""
+        t = np.arange(1000)
+        pcm = (np.sin(2 * np.pi * 700 * t / 24000) * 12000).astype(np.int16).tobytes()
+        
+        whole, _ = downsample_24k_to_8k(pcm)
+        first, tail = downsample_24k_to_8k(pcm[:602])  # 301 samples
+        second, _ = downsample_24k_to_8k(pcm[602:], tail)
+        
+        assert first + second == whole
+
+    def test_attenuates_above_nyquist(self):
+        """Test a 7kHz tone doesn't alias into the 8kHz output."""
+        t = np.arange(2400)
+        tone = (np.sin(2 * np.pi * 7000 * t / 24000) * 16000).astype(np.int16).tobytes()
+        
+        out, _ = downsample_24k_to_8k(tone)
+        
+        samples = np.frombuffer(out, dtype=np.int16)[10:]
+        assert np.abs(samples).max() < 1000
+
+
 class TestRoundTrip:
     """Test audio round-trip conversion."""
 
@@ -159,3 +211,267 @@ class TestRoundTrip:
         # Check we still have a signal
         max_amp = max(abs(s) for s in final_samples)
         assert max_amp > 500  # Signal survived (some loss expected)
+
+
+class TestUlawCodec:
+    """Tests for the NumPy μ-law encoder/decoder."""
+
+    def test_decode_matches_audioop(self):
+        """Test the decode table agrees with audioop for every code."""
+        ulaw = bytes(range(256))
+        
+        assert ulaw_to_pcm16(ulaw).tobytes() == audioop.ulaw2lin(ulaw, 2)
+
+    def test_tables_are_read_only(self):
+        """Test the shared lookup tables can't be modified in place."""
+        assert not ULAW_DECODE_TABLE.flags.writeable
+        assert not ULAW_ENCODE_TABLE.flags.writeable
+
+    def test_tables_packed_together(self):
+        """Test decode and encode tables share one cache-line-aligned block."""
+        assert ULAW_DECODE_TABLE.ctypes.data % 64 == 0
+        assert ULAW_ENCODE_TABLE.ctypes.data == ULAW_DECODE_TABLE.ctypes.data + 512
+
+    def test_encode_matches_audioop(self):
+        """Test the encode table agrees with audioop for every PCM16 sample."""
+        pcm = np.arange(-32768, 32768, dtype=np.int32).astype(np.int16)
+        
+        assert pcm16_to_ulaw(pcm) == audioop.lin2ulaw(pcm.tobytes(), 2)
+
+    def test_encode_handles_full_scale_negative(self):
+        """Test -32768 encodes as the loudest negative code without wrapping."""
+        pcm = np.array([-32768, 32767], dtype=np.int16)
+        
+        assert pcm16_to_ulaw(pcm) == bytes([0x00, 0x80])
+
+    def test_encode_rounds_negative_samples_away_from_zero(self):
+        """Test -x encodes like x + 3 with bit 7 cleared, as audioop's 14-bit shift does."""
+        pcm = np.arange(1, 32765, dtype=np.int16)
+        
+        positive = np.frombuffer(pcm16_to_ulaw(pcm + 3), dtype=np.uint8)
+        negative = np.frombuffer(pcm16_to_ulaw(-pcm), dtype=np.uint8)
+        
+        assert ULAW_ENCODE_TABLE.shape == (65536,)
+        np.testing.assert_array_equal(negative, positive ^ 0x80)
+
+    def test_decode_into_buffer(self):
+        """Test decoding writes into a caller-provided buffer."""
+        buf = np.empty(1024, dtype=np.int16)
+        ulaw = bytes(range(160))
+        
+        out = ulaw_to_pcm16(ulaw, out=buf)
+        
+        assert np.shares_memory(out, buf)
+        assert np.array_equal(out, ulaw_to_pcm16(ulaw))
+
+    def test_round_trip(self):
+        """Test encode → decode stays within μ-law quantization error."""
+        pcm = np.arange(-32768, 32768, 7, dtype=np.int16)
+        
+        decoded = ulaw_to_pcm16(pcm16_to_ulaw(pcm)).astype(np.int32)
+        
+        # Largest segment has a step of 1024
+        assert np.abs(decoded - pcm).max() <= 1024
+
+
+class TestResample:
+    """Tests for the NumPy resampling helpers."""
+
+    def test_upsample_2x_inserts_midpoints(self):
+        """Test 8kHz → 16kHz precedes each original with its midpoint to the last."""
+        pcm = np.array([0, 100, -100, 32767], dtype=np.int16)
+        
+        out = resample(pcm, 8000, 16000)
+        
+        assert out.dtype == np.int16
+        assert out.tolist() == [0, 0, 50, 100, 0, -100, 16333, 32767]
+
+    def test_upsample_2x_matches_fused_decode(self):
+        """Test resampling decoded μ-law matches the fused decode + upsample."""
+        ulaw = bytes(range(256))
+        
+        resampled = resample(ulaw_to_pcm16(ulaw), 8000, 16000)
+        
+        np.testing.assert_array_equal(resampled, decode_twilio_ulaw(ulaw, target_rate=16000))
+
+    def test_downsample_3x_ratio(self):
+        """Test 24kHz → 8kHz keeps every third sample."""
+        pcm = np.zeros(240, dtype=np.int16)
+        
+        out = resample(pcm, 24000, 8000)
+        
+        assert out.dtype == np.int16
+        assert len(out) == 80
+
+    # Short packets take the full-rate kernel, long ones the polyphase one
+    @pytest.mark.parametrize("length", [481, 4801])
+    def test_downsample_3x_matches_full_rate_filter(self, length):
+        """Test decimation equals filtering at 24kHz then keeping every third sample."""
+        pcm = (np.random.default_rng(0).standard_normal(length) * 8000).astype(np.int16)
+        taps = DECIMATE_3X_TAPS.astype(np.int32)
+        full = np.convolve(pcm.astype(np.int32), taps, mode="same") >> 15
+        
+        out = resample(pcm, 24000, 8000)
+        
+        expected = np.clip(full[::3][: length // 3], -32768, 32767)
+        np.testing.assert_array_equal(out, expected)
+
+    def test_downsample_3x_filters_alias(self):
+        """Test content above the 8kHz Nyquist is attenuated before decimation."""
+        rate = 24000
+        t = np.arange(2400)
+        passband = (np.sin(2 * np.pi * 500 * t / rate) * 16000).astype(np.int16)
+        stopband = (np.sin(2 * np.pi * 7000 * t / rate) * 16000).astype(np.int16)
+        
+        # Ignore filter edges
+        pass_amp = np.abs(resample(passband, rate, 8000)[10:-10]).max()
+        stop_amp = np.abs(resample(stopband, rate, 8000)[10:-10]).max()
+        
+        assert pass_amp > 15000
+        assert stop_amp < 1000
+
+    def test_arbitrary_ratio_fallback(self):
+        """Test non-integer ratios still resample to the expected length."""
+        pcm = np.zeros(160, dtype=np.int16)
+        
+        out = resample(pcm, 8000, 12000)
+        
+        assert out.dtype == np.int16
+        assert len(out) == 240
+
+    def test_arbitrary_ratio_int16_interpolates(self):
+        """Test the int16 fallback tracks a float interpolation of the same signal."""
+        pcm = (np.sin(np.arange(160) / 5) * 16000).astype(np.int16)
+        expected = np.interp(np.linspace(0, 1, 240), np.linspace(0, 1, 160), pcm)
+        
+        out = resample(pcm, 8000, 12000)
+        
+        assert np.abs(out - expected).max() <= 1
+
+    def test_non_int16_fallback(self):
+        """Test float audio still resamples via interpolation."""
+        pcm = np.zeros(160, dtype=np.float32)
+        
+        out = resample(pcm, 8000, 12000)
+        
+        assert out.dtype == np.float32
+        assert len(out) == 240
+
+    def test_non_int16_fallback_matches_interp(self):
+        """Test the fallback interpolates like np.interp over aligned endpoints."""
+        pcm = np.sin(np.arange(160) / 5).astype(np.float32)
+        expected = np.interp(np.linspace(0, 1, 240), np.linspace(0, 1, 160), pcm)
+        
+        out = resample(pcm, 8000, 12000)
+        
+        assert np.allclose(out, expected, atol=1e-4)
+
+
+class TestFusedKernels:
+    """Tests for the fused decode/encode + rate conversion kernels."""
+
+    def test_decode_upsample_interleaves_midpoints(self):
+        """Test each decoded sample is preceded by its midpoint with the previous."""
+        ulaw = bytes(range(256))
+        decoded = ulaw_to_pcm16(ulaw).astype(np.int32)
+        
+        fused, carry = ulaw_decode_upsample2x(ulaw, prev=100)
+        
+        assert np.array_equal(fused[1::2], decoded)
+        assert fused[0] == (100 + decoded[0]) >> 1
+        assert np.array_equal(fused[2::2], (decoded[:-1] + decoded[1:]) >> 1)
+        assert carry == decoded[-1]
+
+    def test_decode_upsample_continuous_across_packets(self):
+        """Test carrying state makes split packets match one long packet."""
+        ulaw = bytes(range(0, 256, 3))
+        
+        whole, _ = ulaw_decode_upsample2x(ulaw)
+        first, carry = ulaw_decode_upsample2x(ulaw[:40])
+        second, _ = ulaw_decode_upsample2x(ulaw[40:], carry)
+        
+        assert np.array_equal(np.concatenate([first, second]), whole)
+
+    def test_decode_upsample_reuses_buffer(self):
+        """Test the output is written into a caller-provided buffer."""
+        buf = np.empty(1024, dtype=np.int16)
+        
+        out, _ = ulaw_decode_upsample2x(bytes([0x80] * 160), out=buf)
+        
+        assert len(out) == 320
+        assert np.shares_memory(out, buf)
+
+    def test_decode_upsample_work_buffer_matches(self):
+        """Test supplying the midpoint work buffer doesn't change the output."""
+        ulaw = bytes(range(256))
+        work = np.empty(256, dtype=np.int16)
+        
+        expected, _ = ulaw_decode_upsample2x(ulaw, prev=-300)
+        out, _ = ulaw_decode_upsample2x(ulaw, prev=-300, work=work)
+        
+        np.testing.assert_array_equal(out, expected)
+
+    def test_downsample_encode_matches_unfused(self):
+        """Test fused 3x decimation + μ-law encode equals the two-step path."""
+        t = np.arange(480)
+        pcm = (np.sin(2 * np.pi * 400 * t / 24000) * 16000).astype(np.int16)
+        
+        fused = downsample3x_ulaw_encode(pcm)
+        
+        assert fused.tobytes() == pcm16_to_ulaw(resample(pcm, 24000, 8000))
+
+
+class TestAudioScratch:
+    """Tests for per-connection scratch buffer reuse."""
+
+    def test_twilio_to_pcm16_reuses_scratch(self):
+        """Test inbound conversion writes into the scratch buffer."""
+        scratch = AudioScratch()
+        payload = base64.b64encode(bytes(range(160))).decode()
+        
+        out = twilio_audio_to_pcm16(payload, scratch=scratch)
+        
+        assert np.shares_memory(out, scratch.up)
+        assert np.array_equal(out, twilio_audio_to_pcm16(payload))
+
+    def test_batched_decode_matches_per_packet(self):
+        """Test converting several packets at once matches converting each in turn."""
+        packets = [bytes(range(i, i + 160)) for i in range(0, 75, 25)]
+        per_packet = AudioScratch()
+        
+        expected = np.concatenate([
+            twilio_audio_to_pcm16(base64.b64encode(p).decode(), scratch=per_packet).copy()
+            for p in packets
+        ])
+        
+        out = decode_twilio_ulaw(bytearray(b"".join(packets)), scratch=AudioScratch())
+        
+        np.testing.assert_array_equal(out, expected)
+
+    def test_pcm16_to_twilio_matches_without_scratch(self):
+        """Test outbound conversion output is unchanged by scratch reuse."""
+        scratch = AudioScratch()
+        t = np.arange(480)
+        pcm = (np.sin(2 * np.pi * 400 * t / 24000) * 16000).astype(np.int16)
+        
+        assert pcm16_to_twilio_audio(pcm, scratch=scratch) == pcm16_to_twilio_audio(pcm)
+
+    def test_pcm16_to_twilio_accepts_raw_bytes(self):
+        """Test bytes and memoryview input convert the same as an int16 array."""
+        t = np.arange(480)
+        pcm = (np.sin(2 * np.pi * 400 * t / 24000) * 16000).astype(np.int16)
+        
+        expected = pcm16_to_twilio_audio(pcm)
+        
+        assert pcm16_to_twilio_audio(pcm.tobytes()) == expected
+        assert pcm16_to_twilio_audio(memoryview(pcm.tobytes())) == expected
+
+    def test_scratch_grows_for_large_packets(self):
+        """Test packets larger than the initial sizing still convert."""
+        scratch = AudioScratch(max_ulaw_bytes=16)
+        payload = base64.b64encode(bytes([0x80] * 160)).decode()
+        
+        out = twilio_audio_to_pcm16(payload, scratch=scratch)
+        
+        assert len(out) == 320
+        assert len(scratch.up) >= 320
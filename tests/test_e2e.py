@@ -5,12 +5,14 @@ import base64
 import json
 import math
 import struct
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
 
 import pytest
 from fastapi.testclient import TestClient
-from httpx import ASGITransport, AsyncClient
 
 from agent_voice_bridge.server import app
+from agent_voice_bridge.session_pool import GeminiSessionPool
 
 
 class TestHealthEndpoint:
@@ -50,6 +52,18 @@ class TestIncomingCallEndpoint:
         assert "<Stream" in content
         assert "media-stream" in content
 
+    def test_incoming_call_escapes_caller(self):
+        """Test the caller is XML-escaped inside the Parameter attribute."""
+        client = TestClient(app)
+        
+        response = client.post(
+            "/incoming",
+            data={"From": '"><Hangup/>', "CallSid": "CA123"},
+        )
+        
+        assert "<Hangup/>" not in response.text
+        assert 'value="&quot;&gt;&lt;Hangup/&gt;"' in response.text
+
 
 class TestMediaStreamSimulation:
     """Simulate Twilio media stream messages."""
@@ -112,6 +126,158 @@ class TestMediaStreamSimulation:
         # This just tests the initial connection
         pass  # Will need proper mocking
 
+    def test_audio_bridged_both_ways(
+        self, monkeypatch, twilio_start_message, twilio_media_message, twilio_stop_message
+    ):
+        """Test caller audio reaches Gemini and Gemini audio reaches Twilio."""
+        session = FakeLiveSession(reply=[bytes(960)])  # 20ms at 24kHz
+        monkeypatch.setattr(app.state, "gemini", FakeGeminiClient(session), raising=False)
+        monkeypatch.setattr(app.state, "gemini_pool", None, raising=False)
+        
+        client = TestClient(app)
+        with client.websocket_connect("/media-stream") as ws:
+            ws.send_text(json.dumps(twilio_start_message))
+            # 20 x 20ms frames fill one 300ms buffer with some left over
+            for _ in range(20):
+                ws.send_text(json.dumps(twilio_media_message))
+            
+            reply = json.loads(ws.receive_text())
+            ws.send_text(json.dumps(twilio_stop_message))
+        
+        assert len(session.audio_sent) == 1
+        assert len(session.audio_sent[0]) == 9600
+        
+        assert reply["event"] == "media"
+        assert reply["streamSid"] == "MZ123456789"
+        assert len(base64.b64decode(reply["media"]["payload"])) == 160
+
+    def test_small_gemini_chunks_coalesced(
+        self, monkeypatch, twilio_start_message, twilio_media_message, twilio_stop_message
+    ):
+        """Test many small Gemini chunks go out as one 20ms Twilio frame."""
+        session = FakeLiveSession(reply=[bytes(96)] * 10)  # 10 x 2ms at 24kHz
+        monkeypatch.setattr(app.state, "gemini", FakeGeminiClient(session), raising=False)
+        monkeypatch.setattr(app.state, "gemini_pool", None, raising=False)
+        
+        client = TestClient(app)
+        with client.websocket_connect("/media-stream") as ws:
+            ws.send_text(json.dumps(twilio_start_message))
+            for _ in range(20):
+                ws.send_text(json.dumps(twilio_media_message))
+            
+            reply = json.loads(ws.receive_text())
+            ws.send_text(json.dumps(twilio_stop_message))
+        
+        assert len(base64.b64decode(reply["media"]["payload"])) == 160
+
+    def test_binary_frames_parsed(
+        self, monkeypatch, twilio_start_message, twilio_media_message
+    ):
+        """Test JSON sent in binary frames is handled like text frames."""
+        session = FakeLiveSession(reply=[bytes(960)])
+        monkeypatch.setattr(app.state, "gemini", FakeGeminiClient(session), raising=False)
+        monkeypatch.setattr(app.state, "gemini_pool", None, raising=False)
+        
+        client = TestClient(app)
+        with client.websocket_connect("/media-stream") as ws:
+            ws.send_bytes(json.dumps(twilio_start_message).encode())
+            for _ in range(20):
+                ws.send_bytes(json.dumps(twilio_media_message).encode())
+            
+            reply = json.loads(ws.receive_text())
+            # Closing without a stop event ends the stream cleanly
+        
+        assert len(session.audio_sent) == 1
+        assert reply["streamSid"] == "MZ123456789"
+
+    def test_audio_bridged_through_pool(
+        self, monkeypatch, twilio_start_message, twilio_media_message, twilio_stop_message
+    ):
+        """Test a call leases the pool's warm session and the pool refills."""
+        warm = FakeLiveSession(reply=[bytes(960)])
+        spare = FakeLiveSession(reply=[bytes(960)])
+        gemini = FakeGeminiClient(warm, spare)
+        pool = GeminiSessionPool(gemini, model="m", config=None, size=1)
+        
+        @asynccontextmanager
+        async def warm_lifespan(app):
+            pool.start()
+            while gemini.connects < 1:
+                await asyncio.sleep(0)
+            yield
+            await pool.close()
+        
+        monkeypatch.setattr(app.router, "lifespan_context", warm_lifespan)
+        monkeypatch.setattr(app.state, "gemini_pool", pool, raising=False)
+        # Connecting without the pool would fail on this
+        monkeypatch.setattr(app.state, "gemini", None, raising=False)
+        
+        with TestClient(app) as client:
+            with client.websocket_connect("/media-stream") as ws:
+                ws.send_text(json.dumps(twilio_start_message))
+                for _ in range(20):
+                    ws.send_text(json.dumps(twilio_media_message))
+                
+                reply = json.loads(ws.receive_text())
+                ws.send_text(json.dumps(twilio_stop_message))
+        
+        # The call ran on the warm session; the second connect is the
+        # replacement the lease spawned, which no call used
+        assert len(warm.audio_sent) == 1
+        assert spare.audio_sent == []
+        assert gemini.connects == 2
+        assert reply["streamSid"] == "MZ123456789"
+        assert len(base64.b64decode(reply["media"]["payload"])) == 160
+
+class FakeLiveSession:
+    """Stand-in for a Gemini Live session that answers the first audio."""
+
+    def __init__(self, reply: list[bytes]):
+        self.reply = reply
+        self.audio_sent: list[bytes] = []
+        self._got_audio = asyncio.Event()
+
+    async def send(self, input=None, end_of_turn=False):
+        pass
+
+    async def send_realtime_input(self, audio):
+        assert audio.mime_type == "audio/pcm;rate=16000"
+        self.audio_sent.append(audio.data)
+        self._got_audio.set()
+
+    async def receive(self):
+        await self._got_audio.wait()
+        parts = [
+            SimpleNamespace(inline_data=SimpleNamespace(data=chunk), text=None)
+            for chunk in self.reply
+        ]
+        yield SimpleNamespace(
+            server_content=SimpleNamespace(
+                model_turn=SimpleNamespace(parts=parts),
+                turn_complete=True,
+            )
+        )
+        # Block like a live session waiting for the next turn
+        await asyncio.Event().wait()
+
+
+class FakeGeminiClient:
+    """Stand-in for genai.Client exposing aio.live.connect().
+    
+    Each connect yields the next of ``sessions``, repeating the last.
+    """
+
+    def __init__(self, *sessions: FakeLiveSession):
+        self.sessions = sessions
+        self.connects = 0
+        self.aio = SimpleNamespace(live=SimpleNamespace(connect=self._connect))
+
+    @asynccontextmanager
+    async def _connect(self, model, config):
+        session = self.sessions[min(self.connects, len(self.sessions) - 1)]
+        self.connects += 1
+        yield session
+
 
 class TestAudioRecording:
     """Test audio recording for debugging."""
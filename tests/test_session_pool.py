@@ -0,0 +1,161 @@
+"""Tests for the warm Gemini session pool."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from websockets.protocol import State
+
+from agent_voice_bridge.session_pool import GeminiSessionPool
+
+
+class CountingClient:
+    """Stand-in for genai.Client that hands out numbered sessions."""
+
+    def __init__(self):
+        self.opened = []
+        self.closed = []
+        self.aio = SimpleNamespace(live=SimpleNamespace(connect=self._connect))
+
+    @asynccontextmanager
+    async def _connect(self, model, config):
+        session = len(self.opened)
+        self.opened.append(session)
+        try:
+            yield self._wrap(session)
+        finally:
+            self.closed.append(session)
+
+    def _wrap(self, number):
+        return number
+
+
+class FakeWebSocket:
+    """Stand-in for the SDK session's WebSocket connection."""
+
+    def __init__(self):
+        self.state = State.OPEN
+        self._closed = asyncio.Event()
+
+    def close_from_server(self):
+        self.state = State.CLOSED
+        self._closed.set()
+
+    async def wait_closed(self):
+        await self._closed.wait()
+
+
+class SocketClient(CountingClient):
+    """CountingClient whose sessions expose a WebSocket, like the SDK's."""
+
+    def _wrap(self, number):
+        return SimpleNamespace(number=number, _ws=FakeWebSocket())
+
+
+async def wait_until(condition, timeout=1.0):
+    """Yield to the event loop until ``condition()`` holds."""
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0)
+
+
+def make_pool(client, size=1, max_idle=60.0):
+    """Build a pool over the fake client."""
+    return GeminiSessionPool(client, model="m", config=None, size=size, max_idle=max_idle)
+
+
+class TestGeminiSessionPool:
+    """Tests for leasing and recycling warm sessions."""
+
+    async def test_lease_uses_warm_session(self):
+        """Test a call gets the already-connected session and the pool refills."""
+        client = CountingClient()
+        pool = make_pool(client)
+        pool.start()
+        await wait_until(lambda: len(client.opened) == 1)
+        
+        async with pool.session() as session:
+            assert session == 0
+            # A replacement is connected while the call runs
+            await wait_until(lambda: len(client.opened) == 2)
+        
+        # The used session is closed, never handed out again
+        await wait_until(lambda: client.closed == [0])
+        async with pool.session() as session:
+            assert session == 1
+        
+        await pool.close()
+
+    async def test_connects_directly_when_empty(self):
+        """Test calls still connect when no warm session is ready."""
+        client = CountingClient()
+        pool = make_pool(client, size=0)
+        
+        async with pool.session() as session:
+            assert session == 0
+        
+        assert client.closed == [0]
+        await pool.close()
+
+    async def test_idle_sessions_recycled(self):
+        """Test an unleased session is closed and replaced after max_idle."""
+        client = CountingClient()
+        pool = make_pool(client, max_idle=0.01)
+        pool.start()
+        
+        await wait_until(lambda: len(client.opened) >= 2)
+        
+        assert 0 in client.closed
+        async with pool.session() as session:
+            assert session != 0
+        await pool.close()
+
+    async def test_close_closes_warm_sessions(self):
+        """Test shutting down closes sessions still waiting in the pool."""
+        client = CountingClient()
+        pool = make_pool(client, size=2)
+        pool.start()
+        await wait_until(lambda: len(client.opened) == 2)
+        
+        await pool.close()
+        
+        assert sorted(client.closed) == [0, 1]
+
+    async def test_recycled_sessions_leave_the_pool(self):
+        """Test recycling idle sessions doesn't grow the ready queue."""
+        client = CountingClient()
+        pool = make_pool(client, size=2, max_idle=0.001)
+        pool.start()
+        
+        await wait_until(lambda: len(client.opened) >= 20)
+        
+        assert len(pool._ready) <= 2
+        await pool.close()
+
+    async def test_server_closed_session_replaced(self):
+        """Test a session the server closes is dropped and reconnected."""
+        client = SocketClient()
+        pool = make_pool(client)
+        pool.start()
+        await wait_until(lambda: len(pool._ready) == 1)
+        
+        pool._ready[0].session._ws.close_from_server()
+        
+        await wait_until(lambda: client.closed == [0] and len(pool._ready) == 1)
+        async with pool.session() as session:
+            assert session.number == 1
+        await pool.close()
+
+    async def test_closed_session_not_leased(self):
+        """Test a call connects directly rather than lease a closed session."""
+        client = SocketClient()
+        pool = make_pool(client)
+        pool.start()
+        await wait_until(lambda: len(pool._ready) == 1)
+        
+        # The call arrives before the holder has seen the close
+        pool._ready[0].session._ws.close_from_server()
+        async with pool.session() as session:
+            assert session.number == 1
+            assert session._ws.state is State.OPEN
+        await pool.close()